@@ -1,4 +1,6 @@
+import json
 import logging
+import os
 import re
 import shutil
 import subprocess
@@ -16,6 +18,7 @@ from templates import TEMPLATES
 from warnet.status import RunningStatus
 from warnet.tank import Tank
 from warnet.utils import (
+    BRANCH_VERSION_RE,
     default_bitcoin_conf_args,
     get_architecture,
     parse_raw_messages,
@@ -30,6 +33,12 @@ from .services.node_exporter import NodeExporter
 from .services.prometheus import Prometheus
 from .services.promtail.promtail import Promtail
 
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+
+
 DOCKER_COMPOSE_NAME = "docker-compose.yml"
 DOCKERFILE_NAME = "Dockerfile"
 TORRC_NAME = "torrc"
@@ -41,18 +50,100 @@ CONTAINER_PREFIX_BITCOIND = "tank-bitcoin"
 CONTAINER_PREFIX_LN = "tank-ln"
 CONTAINER_PREFIX_CIRCUITBREAKER = "tank-ln-cb"
 LND_MOUNT_PATH = "/root/.lnd"
+EXPORTER_IMAGE = "jvstein/bitcoin-prometheus-exporter:latest"
+
+# Mapping keys matching this are written unquoted, unless YAML would read them as a bool or null
+YAML_PLAIN_KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]*")
+YAML_RESERVED_WORDS = {"y", "n", "yes", "no", "true", "false", "on", "off", "null"}
+# Characters JSON leaves raw that YAML treats as line breaks or refuses to read unescaped
+YAML_ESCAPE_RE = re.compile("[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]")
 
 logger = logging.getLogger("docker-interface")
 logging.getLogger("docker.utils.config").setLevel(logging.WARNING)
 logging.getLogger("docker.auth").setLevel(logging.WARNING)
 
 
+def yaml_key(key) -> str:
+    if not isinstance(key, str):
+        return yaml_scalar(key)
+    if YAML_PLAIN_KEY_RE.fullmatch(key) and key.lower() not in YAML_RESERVED_WORDS:
+        return key
+    return yaml_scalar(key)
+
+
+def yaml_float(value: float) -> str:
+    # Same spelling as PyYAML's SafeRepresenter so YAML 1.1 reads it back as a float
+    if value != value:
+        return ".nan"
+    if value in (float("inf"), float("-inf")):
+        return ".inf" if value > 0 else "-.inf"
+    text = repr(float(value)).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+def yaml_scalar(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        return yaml_float(value)
+    if isinstance(value, str):
+        # JSON strings are valid double-quoted YAML scalars once YAML's own
+        # line breaks and non-printable characters are escaped as well
+        return YAML_ESCAPE_RE.sub(
+            lambda match: f"\\u{ord(match.group()):04x}", json.dumps(value, ensure_ascii=False)
+        )
+    if isinstance(value, dict | list) and not value:
+        return "{}" if isinstance(value, dict) else "[]"
+    raise TypeError(f"Cannot write {type(value).__name__} value to YAML: {value!r}")
+
+
+def write_yaml_block(obj, parts: list[str], indent: str = ""):
+    """
+    Append a block style YAML rendering of a compose fragment to `parts`.
+    Only the plain dict/list/scalar values that make up compose files are supported.
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, dict | list) and value:
+                parts.append(f"{indent}{yaml_key(key)}:\n")
+                write_yaml_block(value, parts, indent + "  ")
+            else:
+                parts.append(f"{indent}{yaml_key(key)}: {yaml_scalar(value)}\n")
+    elif isinstance(obj, list):
+        for item in obj:
+            if isinstance(item, dict | list) and item:
+                # render the nested block, then hang its first line off the "- " marker
+                start = len(parts)
+                write_yaml_block(item, parts, indent + "  ")
+                parts[start] = f"{indent}- {parts[start][len(indent) + 2 :]}"
+            else:
+                parts.append(f"{indent}- {yaml_scalar(item)}\n")
+    else:
+        raise TypeError(f"Cannot write {type(obj).__name__} block to YAML: {obj!r}")
+
+
+def write_yaml_fragment(file, fragment, indent: str = ""):
+    """
+    Render a compose fragment with `write_yaml_block` and write it to `file` in one call.
+    """
+    parts: list[str] = []
+    write_yaml_block(fragment, parts, indent)
+    file.write("".join(parts))
+
+
 class ComposeBackend(BackendInterface):
     def __init__(self, config_dir: Path, network_name: str) -> None:
         super().__init__(config_dir)
         self.network_name = network_name
         self.client: docker.DockerClient = docker.from_env()
         self._apiclient: docker.APIClient = docker.APIClient(base_url="unix://var/run/docker.sock")
+        self._built_images: set[tuple[str, str, str]] = set()
 
     def build(self) -> bool:
         command = ["docker", "compose", "build"]
@@ -281,13 +372,13 @@ class ComposeBackend(BackendInterface):
         prometheus_path = self.config_dir / "prometheus.yml"
         try:
             with open(prometheus_path, "w") as file:
-                yaml.dump(config, file)
+                yaml.dump(config, file, Dumper=YamlDumper, sort_keys=False)
             logger.info(f"Wrote file: {prometheus_path}")
         except Exception as e:
             logger.error(f"An error occurred while writing to {prometheus_path}: {e}")
 
     def _write_docker_compose(self, warnet):
-        compose = {
+        header = {
             "version": "3.8",
             "name": "warnet",
             "networks": {
@@ -296,13 +387,12 @@ class ComposeBackend(BackendInterface):
                     "ipam": {"config": [{"subnet": warnet.subnet}]},
                 }
             },
-            "volumes": {"grafana-storage": None},
-            "services": {},
         }
+        # LN nodes add their data volumes as they are generated, so volumes are written last
+        volumes = {"grafana-storage": None}
 
-        # Pass services object to each tank so they can add whatever they need.
-        for tank in warnet.tanks:
-            self.add_services(tank, compose)
+        # Images built from source during this generation, tanks sharing a branch build it once
+        self._built_images = set()
 
         # Initialize services and add them to the compose
         services = [
@@ -315,17 +405,32 @@ class ComposeBackend(BackendInterface):
             Promtail(warnet.network_name),
         ]
 
-        for service_obj in services:
-            service_name = service_obj.__class__.__name__.lower()
-            compose["services"][service_name] = service_obj.get_service()
-
-        docker_compose_path = warnet.config_dir / "docker-compose.yml"
+        # Stream services to a temporary file as they are generated rather than holding the
+        # whole compose, and only replace an existing compose file once generation succeeded
+        docker_compose_path = warnet.config_dir / DOCKER_COMPOSE_NAME
+        tmp_path = warnet.config_dir / f"{DOCKER_COMPOSE_NAME}.tmp"
         try:
-            with open(docker_compose_path, "w") as file:
-                yaml.dump(compose, file)
+            with open(tmp_path, "w", buffering=1 << 16) as file:
+                write_yaml_fragment(file, header)
+                file.write("services:\n")
+
+                # Pass services object to each tank so they can add whatever they need.
+                for tank in warnet.tanks:
+                    tank_compose = {"services": {}, "volumes": volumes}
+                    self.add_services(tank, tank_compose)
+                    write_yaml_fragment(file, tank_compose["services"], "  ")
+
+                for service_obj in services:
+                    service_name = service_obj.__class__.__name__.lower()
+                    write_yaml_fragment(file, {service_name: service_obj.get_service()}, "  ")
+
+                write_yaml_fragment(file, {"volumes": volumes})
+            os.replace(tmp_path, docker_compose_path)
             logger.info(f"Wrote file: {docker_compose_path}")
-        except Exception as e:
+        except OSError as e:
             logger.error(f"An error occurred while writing to {docker_compose_path}: {e}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
     def generate_deployment_file(self, warnet):
         self._write_docker_compose(warnet)
@@ -342,9 +447,10 @@ class ComposeBackend(BackendInterface):
 
     def config_args(self, tank: Tank):
         args = self.default_config_args(tank)
-        if tank.bitcoin_config is not None:
-            args = f"{args} -{tank.bitcoin_config.replace(',', ' -')}"
-        return args
+        if not tank.bitcoin_options:
+            # Most graphs carry no per-node overrides, so the defaults are used as-is
+            return args
+        return f"{args} " + " ".join(f"-{option}" for option in tank.bitcoin_options)
 
     def default_config_args(self, tank):
         defaults = default_bitcoin_conf_args()
@@ -362,53 +468,55 @@ class ComposeBackend(BackendInterface):
         services = compose["services"]
         assert tank.index is not None
         container_name = self.get_container_name(tank.index, ServiceType.BITCOIN)
-        services[container_name] = {}
 
         # Setup bitcoind, either release binary, pre-built image or built from source on demand
-        if tank.version and ("/" and "#" in tank.version):
+        if tank.version and BRANCH_VERSION_RE.search(tank.version):
             # it's a git branch, building step is necessary
-            repo, branch = tank.version.split("#")
-            services[container_name]["image"] = f"{LOCAL_REGISTRY}:{branch}"
-            build_image(
-                repo,
-                branch,
-                LOCAL_REGISTRY,
-                branch,
-                tank.DEFAULT_BUILD_ARGS + tank.build_args,
-                arches=get_architecture(),
-            )
+            repo, _, branch = tank.version.partition("#")
+            image = f"{LOCAL_REGISTRY}:{branch}"
+            build_args = tank.DEFAULT_BUILD_ARGS + tank.build_args
+            # build_args is part of the key: tanks on the same branch with different build args
+            # still each run their build, as they did before, even though both write the same
+            # LOCAL_REGISTRY:branch tag
+            if (repo, branch, build_args) not in self._built_images:
+                build_image(
+                    repo,
+                    branch,
+                    LOCAL_REGISTRY,
+                    branch,
+                    build_args,
+                    arches=get_architecture(),
+                )
+                self._built_images.add((repo, branch, build_args))
         elif tank.image:
             # Pre-built custom image
             image = tank.image
-            services[container_name]["image"] = image
         else:
             # Pre-built regular release
             image = f"{DOCKER_REGISTRY}:{tank.version}"
-            services[container_name]["image"] = image
-        # Add common bitcoind service details
-        services[container_name].update(
-            {
-                "container_name": container_name,
-                # logging with json-file to support log shipping with promtail into loki
-                "logging": {"driver": "json-file", "options": {"max-size": "10m"}},
-                "environment": {"BITCOIN_ARGS": self.config_args(tank)},
-                "networks": {
-                    tank.network_name: {
-                        "ipv4_address": f"{tank.ipv4}",
-                    }
-                },
-                "labels": {"warnet": "tank"},
-                "privileged": True,
-                "cap_add": ["NET_ADMIN", "NET_RAW"],
-                "healthcheck": {
-                    "test": ["CMD-SHELL", f"nc -z localhost {tank.rpc_port} || exit 1"],
-                    "interval": "10s",  # Check every 10 seconds
-                    "timeout": "1s",  # Give the check 1 second to complete
-                    "start_period": "5s",  # Start checking after 5 seconds
-                    "retries": 3,
-                },
-            }
-        )
+        # Build the complete bitcoind service before inserting it into the compose
+        services[container_name] = {
+            "image": image,
+            "container_name": container_name,
+            # logging with json-file to support log shipping with promtail into loki
+            "logging": {"driver": "json-file", "options": {"max-size": "10m"}},
+            "environment": {"BITCOIN_ARGS": self.config_args(tank)},
+            "networks": {
+                tank.network_name: {
+                    "ipv4_address": f"{tank.ipv4}",
+                }
+            },
+            "labels": {"warnet": "tank"},
+            "privileged": True,
+            "cap_add": ["NET_ADMIN", "NET_RAW"],
+            "healthcheck": {
+                "test": ["CMD-SHELL", f"nc -z localhost {tank.rpc_port} || exit 1"],
+                "interval": "10s",  # Check every 10 seconds
+                "timeout": "1s",  # Give the check 1 second to complete
+                "start_period": "5s",  # Start checking after 5 seconds
+                "retries": 3,
+            },
+        }
 
         if tank.collect_logs:
             services[container_name]["labels"].update({"collect_logs": True})
@@ -419,7 +527,7 @@ class ComposeBackend(BackendInterface):
         # Add the prometheus data exporter in a neighboring container
         if tank.exporter:
             services[tank.exporter_name] = {
-                "image": "jvstein/bitcoin-prometheus-exporter:latest",
+                "image": EXPORTER_IMAGE,
                 "container_name": tank.exporter_name,
                 "environment": {
                     "BITCOIN_RPC_HOST": tank.ipv4,
@@ -17,7 +17,7 @@ from kubernetes.dynamic.exceptions import ResourceNotFoundError
 from kubernetes.stream import stream
 from warnet.status import RunningStatus
 from warnet.tank import Tank
-from warnet.utils import default_bitcoin_conf_args, parse_raw_messages
+from warnet.utils import BRANCH_VERSION_RE, default_bitcoin_conf_args, parse_raw_messages
 
 DOCKER_REGISTRY_CORE = "bitcoindevproject/bitcoin"
 LOCAL_REGISTRY = "warnet/bitcoin-core"
@@ -334,7 +334,7 @@ class KubernetesBackend(BackendInterface):
         if tank.image:
             container_image = tank.image
         # On-demand built image
-        elif "/" and "#" in tank.version:
+        elif BRANCH_VERSION_RE.search(tank.version):
             # We don't have docker installed on the RPC server, where this code will be run from,
             # and it's currently unclear to me if having the RPC pod build images is a good idea.
             # Don't support this for now in CI by disabling in the workflow.
@@ -343,7 +343,7 @@ class KubernetesBackend(BackendInterface):
             # docker-buildx on the rpc server image.
 
             # it's a git branch, building step is necessary
-            repo, branch = tank.version.split("#")
+            repo, _, branch = tank.version.partition("#")
             build_image(
                 repo,
                 branch,
@@ -224,7 +224,7 @@ class Server:
         """
         Fetch the Bitcoin Core debug log from <node>
         """
-        wn = Warnet.from_network(network, self.backend)
+        wn = self.get_warnet(network)
         try:
             return wn.container_interface.get_bitcoin_debug_log(wn.tanks[node].index)
         except Exception as e:
@@ -7,6 +7,7 @@ import logging
 from backends import ServiceType
 from warnet.lnnode import LNNode
 from warnet.utils import (
+    BRANCH_VERSION_RE,
     SUPPORTED_TAGS,
     exponential_backoff,
     generate_ipv4_addr,
@@ -31,6 +32,8 @@ class Tank:
         self.version: str = ""
         self.image: str = ""
         self.bitcoin_config = ""
+        # bitcoin_config split into individual options once, when the graph node is parsed
+        self.bitcoin_options: tuple[str, ...] = ()
         self.conf_file = None
         self.netem = None
         self.exporter = False
@@ -52,7 +55,7 @@ class Tank:
     def _parse_version(self, version):
         if not version:
             return
-        if version not in SUPPORTED_TAGS and not ("/" in version and "#" in version):
+        if version not in SUPPORTED_TAGS and not BRANCH_VERSION_RE.search(version):
             raise Exception(
                 f"Unsupported version: can't be generated from Docker images: {self.version}"
             )
@@ -68,6 +71,10 @@ class Tank:
             setattr(self, property, value)
             graph_properties[property] = value
 
+        self.bitcoin_options = tuple(
+            option.strip() for option in (self.bitcoin_config or "").split(",") if option.strip()
+        )
+
         if self.version and self.image:
             raise Exception(
                 f"Tank has {self.version=:} and {self.image=:} supplied and can't be built. Provide one or the other."
@@ -87,13 +94,14 @@ class Tank:
         )
 
     @classmethod
-    def from_graph_node(cls, index, warnet, tank=None):
+    def from_graph_node(cls, index, warnet, tank=None, node=None):
         assert index is not None
         index = int(index)
         self = tank
         if self is None:
             self = cls(index, warnet)
-        node = warnet.graph.nodes[index]
+        if node is None:
+            node = warnet.graph.nodes[index]
         self.parse_graph_node(node)
         return self
 
@@ -3,10 +3,10 @@ import ipaddress
 import json
 import logging
 import os
+import platform
 import random
 import re
 import stat
-import subprocess
 import sys
 import time
 from io import BytesIO
@@ -34,6 +34,8 @@ WEIGHTED_TAGS = [
     tag for index, tag in enumerate(reversed(SUPPORTED_TAGS)) for _ in range(index + 1)
 ]
 NODE_SCHEMA_PATH = SCHEMA / "node_schema.json"
+# Versions of the form "<owner>/<repo>#<branch>" are built from source
+BRANCH_VERSION_RE = re.compile(r"/.*#")
 
 
 class NonErrorFilter(logging.Filter):
@@ -96,28 +98,25 @@ def handle_json(func):
     return wrapper
 
 
+@functools.lru_cache(maxsize=1)
 def get_architecture():
     """
     Get the architecture of the machine.
-    :return: The architecture of the machine or None if an error occurred
+    The result is cached as it cannot change for the lifetime of the process.
+    :return: The architecture of the machine
     """
-    result = subprocess.run(["uname", "-m"], stdout=subprocess.PIPE)
-    arch = result.stdout.decode("utf-8").strip()
+    arch = platform.machine()
     if arch == "x86_64":
         arch = "amd64"
-    if arch is None:
+    if not arch:
         raise Exception("Failed to detect architecture.")
+    logger.debug(f"Detected architecture: {arch}")
     return arch
 
 
-def generate_ipv4_addr(subnet):
-    """
-    Generate a valid random IPv4 address within the given subnet.
-
-    :param subnet: Subnet in CIDR notation (e.g., '100.0.0.0/8')
-    :return: Random IP address within the subnet
-    """
-    reserved_ips = [
+RESERVED_IPV4_NETWORKS = [
+    ipaddress.ip_network(reserved)
+    for reserved in [
         "0.0.0.0/8",
         "10.0.0.0/8",
         "100.64.0.0/10",
@@ -133,21 +132,24 @@ def generate_ipv4_addr(subnet):
         "203.0.113.0/24",
         "224.0.0.0/4",
     ]
+]
+
 
-    def is_public(ip):
-        for reserved in reserved_ips:
-            if ipaddress.ip_address(ip) in ipaddress.ip_network(reserved, strict=False):
-                return False
-        return True
+def generate_ipv4_addr(subnet):
+    """
+    Generate a valid random IPv4 address within the given subnet.
 
+    :param subnet: Subnet in CIDR notation (e.g., '100.0.0.0/8')
+    :return: Random IP address within the subnet
+    """
     network = ipaddress.ip_network(subnet, strict=False)
 
     # Generate a random IP within the subnet range
     while True:
         ip_int = random.randint(int(network.network_address), int(network.broadcast_address))
-        ip_str = str(ipaddress.ip_address(ip_int))
-        if is_public(ip_str):
-            return ip_str
+        ip = ipaddress.IPv4Address(ip_int)
+        if not any(ip in reserved for reserved in RESERVED_IPV4_NETWORKS):
+            return str(ip)
 
 
 def sanitize_tc_netem_command(command: str) -> bool:
@@ -216,9 +218,10 @@ def parse_bitcoin_conf(file_content):
         if line.startswith("[") and line.endswith("]"):
             current_section = line[1:-1]
             result[current_section] = []
-        elif "=" in line:
-            key, value = line.split("=", 1)
-            result[current_section].append((key.strip(), value.strip()))
+        else:
+            key, sep, value = line.partition("=")
+            if sep:
+                result[current_section].append((key.strip(), value.strip()))
 
     return result
 
@@ -388,10 +391,10 @@ def set_execute_permission(file_path):
     os.chmod(file_path, current_permissions | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
 
-def default_bitcoin_conf_args() -> str:
-    default_conf: Path = TEMPLATES / "bitcoin.conf"
-
-    with default_conf.open("r") as f:
+@functools.lru_cache(maxsize=4)
+def load_bitcoin_conf_args(conf_path: Path, mtime: float) -> str:
+    # mtime is only part of the cache key, so an edited file is parsed again
+    with conf_path.open("r") as f:
         defaults = parse_bitcoin_conf(f.read())
 
     conf_args = []
@@ -404,6 +407,12 @@ def default_bitcoin_conf_args() -> str:
     return " ".join(conf_args)
 
 
+def default_bitcoin_conf_args() -> str:
+    # Every tank shares the template defaults, so only parse them when the template changes
+    default_conf: Path = TEMPLATES / "bitcoin.conf"
+    return load_bitcoin_conf_args(default_conf, default_conf.stat().st_mtime)
+
+
 def create_cycle_graph(n: int, version: str, bitcoin_conf: str | None, random_version: bool):
     try:
         # Use nx.DiGraph() as base otherwise edges not always made in specific directions
@@ -504,5 +513,5 @@ def validate_graph_schema(node_schema: dict, graph: nx.Graph):
     """
     Validate a networkx.Graph against the node schema
     """
-    for i in list(graph.nodes):
-        validate(instance=graph.nodes[i], schema=node_schema)
+    for _, node_data in graph.nodes(data=True):
+        validate(instance=node_data, schema=node_schema)
@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import networkx
@@ -17,6 +18,8 @@ from warnet.utils import gen_config_dir, load_schema, validate_graph_schema
 
 logger = logging.getLogger("warnet")
 FO_CONF_NAME = "fork_observer_config.toml"
+# Exports are bound by container file transfers, not CPU
+EXPORT_MAX_WORKERS = 8
 
 
 class Warnet:
@@ -141,19 +144,19 @@ class Warnet:
     def tanks_from_graph(self):
         if not self.graph:
             return
-        for node_id in self.graph.nodes():
+        # import edges as list of destinations to connect to, in a single pass over all edges
+        init_peers: dict[int, list[int]] = {}
+        for src, dst, data in self.graph.edges(data=True):
+            if "channel" in data:
+                continue
+            init_peers.setdefault(src, []).append(int(dst))
+        for node_id, node in self.graph.nodes(data=True):
             if int(node_id) != len(self.tanks):
                 raise Exception(
                     f"Node ID in graph must be incrementing integers (got '{node_id}', expected '{len(self.tanks)}')"
                 )
-            tank = Tank.from_graph_node(node_id, self)
-            # import edges as list of destinations to connect to
-            for edge in self.graph.edges(data=True):
-                (src, dst, data) = edge
-                if "channel" in data:
-                    continue
-                if src == node_id:
-                    tank.init_peers.append(int(dst))
+            tank = Tank.from_graph_node(node_id, self, node=node)
+            tank.init_peers.extend(init_peers.get(node_id, []))
             self.tanks.append(tank)
         logger.info(f"Imported {len(self.tanks)} tanks from graph")
 
@@ -198,10 +201,19 @@ class Warnet:
         if self.backend != "compose":
             raise NotImplementedError("Export is only supported for compose backend")
         config = {"nodes": []}
-        for tank in self.tanks:
-            tank.export(config, subdir)
+
+        def export_tank(tank):
+            tank_config = {"nodes": []}
+            tank.export(tank_config, subdir)
+            return tank_config["nodes"]
+
+        # Tanks export independently, fetch their files concurrently but keep node order
+        with ThreadPoolExecutor(max_workers=EXPORT_MAX_WORKERS) as executor:
+            for nodes in executor.map(export_tank, self.tanks):
+                config["nodes"].extend(nodes)
         config_path = os.path.join(subdir, "sim.json")
-        with open(config_path, "a") as f:
+        # Overwrite any sim.json left over from a previous export
+        with open(config_path, "w") as f:
             json.dump(config, f)
 
     def wait_for_health(self):
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import math
+
+import yaml
+from backends.compose.compose_backend import write_yaml_block
+
+
+def render(obj):
+    parts = []
+    write_yaml_block(obj, parts)
+    return "".join(parts)
+
+
+def assert_round_trip(obj):
+    out = render(obj)
+    loaded = yaml.safe_load(out)
+    assert loaded == obj, f"YAML round trip mismatch:\n{out}\n{loaded!r} != {obj!r}"
+
+
+print("\nTesting nested containers")
+assert_round_trip(
+    {
+        "networks": {"warnet": {"ipam": {"config": [{"subnet": "100.0.0.0/8"}]}}},
+        "lists": [1, [2, [3, 4]], {"a": [5, {"b": 6}]}, [], {}],
+        "empty_dict": {},
+        "empty_list": [],
+        "volumes": {"grafana-storage": None},
+    }
+)
+
+print("\nTesting keys YAML would otherwise misread")
+assert_round_trip(
+    {
+        "on": 1,
+        "Yes": 2,
+        "null": 3,
+        "OFF": 4,
+        "1": "string key",
+        1: "int key",
+        "a b: c": 5,
+        "#comment": 6,
+        "": 7,
+    }
+)
+
+print("\nTesting scalars")
+assert_round_trip(
+    {
+        "bools": [True, False],
+        "ints": [0, -1, 18443],
+        "floats": [0.5, -2.0, 1e20, 1e-05, 1.5e300, float("inf"), float("-inf")],
+        "strings": ["3.8", "true", "null", "10s", "", " padded ", "a: b", "- x", "'q'", '"dq"'],
+        "escapes": ["line\nbreak", "tab\there", "back\\slash", "\x00\x1f\x7f\x85", "  "],
+        "unicode": ["-uacomment=😀", "é", "日本語", "\ufeff", "\u2028\u2029", "\ud800"],
+        "bitcoin_args": "-regtest=1 -rpcauth=u:x=y --uacomment=w0 #not a comment",
+    }
+)
+
+print("\nTesting NaN")
+nan = yaml.safe_load(render({"nan": float("nan")}))["nan"]
+assert isinstance(nan, float) and math.isnan(nan)
+
+print("\nTesting unsupported types are rejected")
+for value in [("x", "y"), {"x"}, b"x", object()]:
+    try:
+        render({"value": value})
+    except TypeError:
+        pass
+    else:
+        raise AssertionError(f"{type(value).__name__} was written instead of rejected")
+try:
+    render({("x", "y"): 1})
+except TypeError:
+    pass
+else:
+    raise AssertionError("tuple key was written instead of rejected")
+
+print("\nYAML writer round trips through yaml.safe_load")
@@ -48,7 +48,7 @@ print("\nEnsuring no circuit breaker forwards yet")
 assert len(get_cb_forwards(1)["forwards"]) == 0
 
 print("\nTest LN payment from 0 -> 2")
-inv = json.loads(base.warcli("lncli 2 addinvoice --amt=1234"))["payment_request"]
+inv = base.lncli(2, "addinvoice", "--amt=1234")["payment_request"]
 
 print(f"\nGot invoice from node 2: {inv}")
 print("\nPaying invoice from node 0...")
@@ -57,16 +57,19 @@ print(base.warcli(f"lncli 0 payinvoice -f {inv}"))
 print("Waiting for payment success")
 
 
-def check_invoices():
-    invs = json.loads(base.warcli("lncli 2 listinvoices"))["invoices"]
-    if len(invs) > 0 and invs[0]["state"] == "SETTLED":
-        print("\nSettled!")
-        return True
-    else:
-        return False
+def invoices_settled(node):
+    def check_invoices():
+        invs = base.lncli(node, "listinvoices")["invoices"]
+        if len(invs) > 0 and invs[0]["state"] == "SETTLED":
+            print("\nSettled!")
+            return True
+        else:
+            return False
 
+    return check_invoices
 
-base.wait_for_predicate(check_invoices)
+
+base.wait_for_predicate(invoices_settled(2), interval=1)
 
 print("\nEnsuring circuit breaker tracked payment")
 assert len(get_cb_forwards(1)["forwards"]) == 1
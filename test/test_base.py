@@ -1,4 +1,5 @@
 import atexit
+import json
 import os
 import sys
 import threading
@@ -88,6 +89,14 @@ class TestBase:
     def rpc(self, method, params=None):
         return rpc_call(method, params)
 
+    # Execute lncli on a tank via the RPC API and decode its JSON output
+    def lncli(self, node, *args):
+        return json.loads(
+            self.rpc(
+                "tank_lncli", {"network": self.network_name, "node": node, "command": list(args)}
+            )
+        )
+
     # Repeatedly execute an RPC until it succeeds
     @exponential_backoff(max_retries=20)
     def wait_for_rpc(self, method, params=None):